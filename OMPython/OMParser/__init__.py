@@ -38,9 +38,14 @@ from __future__ import print_function
 from builtins import int, range
 
 import sys
+import threading
 
 result = dict()
 
+# the parser keeps its state in the module globals above; parse_values() holds
+# this lock so that concurrent sessions do not see each other's results
+_lock = threading.RLock()
+
 inner_sets = []
 next_set_list = []
 next_set = []
@@ -909,3 +914,17 @@ def check_for_values(string):
             check_for_values(next_set)
 
     return result
+
+
+def parse_values(string):
+    """
+    Like check_for_values(), but starts from an empty result and leaves the
+    module state empty again, so callers need not reset OMParser.result.
+    """
+    global result
+    with _lock:
+        result = dict()
+        try:
+            return check_for_values(string)
+        finally:
+            result = dict()
@@ -37,26 +37,7 @@ __license__ = """
 __status__ = "Prototype"
 __maintainer__ = "https://openmodelica.org"
 
-from pyparsing import (
-    Combine,
-    Dict,
-    Forward,
-    Group,
-    Keyword,
-    Optional,
-    QuotedString,
-    StringEnd,
-    Suppress,
-    Word,
-    alphanums,
-    alphas,
-    delimitedList,
-    nums,
-    replaceWith,
-    infixNotation,
-    opAssoc,
-)
-
+import re
 import sys
 
 def convertNumbers(s, l, toks):
@@ -100,48 +81,217 @@ def evaluateExpression(s, loc, toks):
     except Exception:
         return expr
 
-# Number parsing (supports arithmetic expressions in dimensions) (e.g., {1 + 1, 1})
-arrayDimension = infixNotation(
-    Word(alphas + "_", alphanums + "_") | Word(nums),
-    [
-        (Word("+-", exact=1), 1, opAssoc.RIGHT),
-        (Word("*/", exact=1), 2, opAssoc.LEFT),
-        (Word("+-", exact=1), 2, opAssoc.LEFT),
-    ],
-).setParseAction(evaluateExpression)
-
-omcRecord = Forward()
-omcValue = Forward()
-
-TRUE = Keyword("true").setParseAction(replaceWith(True))
-FALSE = Keyword("false").setParseAction(replaceWith(False))
-NONE = (Keyword("NONE") + Suppress("(") + Suppress(")")).setParseAction(replaceWith(None))
-SOME = (Suppress(Keyword("SOME")) + Suppress("(") + omcValue + Suppress(")"))
-
-omcString = QuotedString(quoteChar='"', escChar='\\', multiline=True).setParseAction(convertString)
-omcNumber = Combine(Optional('-') + ('0' | Word('123456789', nums)) +
-                    Optional('.' + Word(nums)) +
-                    Optional(Word('eE', exact=1) + Word(nums + '+-', nums)))
-
-#ident = Word(alphas + "_", alphanums + "_") | Combine("'" + Word(alphanums + "!#$%&()*+,-./:;<>=?@[]^{}|~ ") + "'")
-ident = Word(alphas + "_", alphanums + "_") | QuotedString(quoteChar='\'', escChar='\\').setParseAction(convertString2)
-fqident = Forward()
-fqident << ((ident + "." + fqident) | ident)
-omcValues = delimitedList(omcValue)
-omcTuple = Group(Suppress('(') + Optional(omcValues) + Suppress(')')).setParseAction(convertTuple)
-omcArray = Group(Suppress('{') + Optional(omcValues) + Suppress('}')).setParseAction(convertTuple)
-omcArraySpecialTypes = Group(Suppress('{') + delimitedList(arrayDimension) + Suppress('}')).setParseAction(convertTuple)
-omcValue << (omcString | omcNumber | omcRecord | omcArray | omcArraySpecialTypes | omcTuple | SOME | TRUE | FALSE | NONE | Combine(fqident))
-recordMember = delimitedList(Group(ident + Suppress('=') + omcValue))
-omcRecord << Group(Suppress('record') + Suppress(fqident) + Dict(recordMember) + Suppress('end') + Suppress(fqident) + Suppress(';')).setParseAction(convertDict)
-
-omcGrammar = Optional(omcValue) + StringEnd()
-
-omcNumber.setParseAction(convertNumbers)
+
+def _buildGrammar():
+    from pyparsing import (
+        Combine,
+        Dict,
+        Forward,
+        Group,
+        Keyword,
+        Optional,
+        QuotedString,
+        StringEnd,
+        Suppress,
+        Word,
+        alphanums,
+        alphas,
+        delimitedList,
+        nums,
+        replaceWith,
+        infixNotation,
+        opAssoc,
+    )
+
+    # Number parsing (supports arithmetic expressions in dimensions) (e.g., {1 + 1, 1})
+    arrayDimension = infixNotation(
+        Word(alphas + "_", alphanums + "_") | Word(nums),
+        [
+            (Word("+-", exact=1), 1, opAssoc.RIGHT),
+            (Word("*/", exact=1), 2, opAssoc.LEFT),
+            (Word("+-", exact=1), 2, opAssoc.LEFT),
+        ],
+    ).setParseAction(evaluateExpression)
+
+    omcRecord = Forward()
+    omcValue = Forward()
+
+    TRUE = Keyword("true").setParseAction(replaceWith(True))
+    FALSE = Keyword("false").setParseAction(replaceWith(False))
+    NONE = (Keyword("NONE") + Suppress("(") + Suppress(")")).setParseAction(replaceWith(None))
+    SOME = (Suppress(Keyword("SOME")) + Suppress("(") + omcValue + Suppress(")"))
+
+    omcString = QuotedString(quoteChar='"', escChar='\\', multiline=True).setParseAction(convertString)
+    omcNumber = Combine(Optional('-') + ('0' | Word('123456789', nums)) +
+                        Optional('.' + Word(nums)) +
+                        Optional(Word('eE', exact=1) + Word(nums + '+-', nums)))
+
+    #ident = Word(alphas + "_", alphanums + "_") | Combine("'" + Word(alphanums + "!#$%&()*+,-./:;<>=?@[]^{}|~ ") + "'")
+    ident = Word(alphas + "_", alphanums + "_") | QuotedString(quoteChar='\'', escChar='\\').setParseAction(convertString2)
+    fqident = Forward()
+    fqident << ((ident + "." + fqident) | ident)
+    omcValues = delimitedList(omcValue)
+    omcTuple = Group(Suppress('(') + Optional(omcValues) + Suppress(')')).setParseAction(convertTuple)
+    omcArray = Group(Suppress('{') + Optional(omcValues) + Suppress('}')).setParseAction(convertTuple)
+    omcArraySpecialTypes = Group(Suppress('{') + delimitedList(arrayDimension) + Suppress('}')).setParseAction(convertTuple)
+    omcValue << (omcString | omcNumber | omcRecord | omcArray | omcArraySpecialTypes | omcTuple | SOME | TRUE | FALSE | NONE | Combine(fqident))
+    recordMember = delimitedList(Group(ident + Suppress('=') + omcValue))
+    omcRecord << Group(Suppress('record') + Suppress(fqident) + Dict(recordMember) + Suppress('end') + Suppress(fqident) + Suppress(';')).setParseAction(convertDict)
+
+    omcGrammar = Optional(omcValue) + StringEnd()
+
+    omcNumber.setParseAction(convertNumbers)
+    return omcGrammar
+
+
+_omcGrammar = None
+
+
+def _getGrammar():
+    # pyparsing is slow to import and building the grammar is not free; only
+    # pay for it once a result needs the full grammar
+    global _omcGrammar
+    if _omcGrammar is None:
+        _omcGrammar = _buildGrammar()
+    return _omcGrammar
+
+
+def __getattr__(name):
+    if name == 'omcGrammar':
+        return _getGrammar()
+    if name == 'ParseException':
+        from pyparsing import ParseException
+        return ParseException
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+# Hand-written parser for the common subset of the pyparsing grammar. It walks the
+# string once and builds the Python values directly; anything it is not sure
+# about (escaped strings, quoted identifiers, arithmetic in array dimensions,
+# malformed input) is handed to the pyparsing grammar, which stays the reference.
+_whitespace = re.compile(r'[ \t\r\n]*')
+_number = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+_ident = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_fqident = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*')
+
+
+class _NotHandled(Exception):
+    pass
+
+
+def _skip(s, i):
+    return _whitespace.match(s, i).end()
+
+
+def _expect(s, i, token):
+    i = _skip(s, i)
+    if not s.startswith(token, i):
+        raise _NotHandled()
+    return i + len(token)
+
+
+def _fastValues(s, i, close):
+    values = []
+    i = _skip(s, i)
+    if s.startswith(close, i):
+        return tuple(values), i + 1
+    while True:
+        value, i = _fastValue(s, i)
+        values.append(value)
+        i = _skip(s, i)
+        if s.startswith(',', i):
+            i += 1
+        elif s.startswith(close, i):
+            return tuple(values), i + 1
+        else:
+            raise _NotHandled()
+
+
+def _fastRecord(s, i):
+    m = _fqident.match(s, _skip(s, i))
+    if m is None:
+        raise _NotHandled()
+    i = m.end()
+    fields = {}
+    while True:
+        m = _ident.match(s, _skip(s, i))
+        if m is None:
+            raise _NotHandled()
+        value, i = _fastValue(s, _expect(s, m.end(), '='))
+        fields[m.group()] = value
+        i = _skip(s, i)
+        if not s.startswith(',', i):
+            break
+        i += 1
+    m = _fqident.match(s, _expect(s, i, 'end'))
+    if m is None:
+        raise _NotHandled()
+    return fields, _expect(s, m.end(), ';')
+
+
+def _fastValue(s, i):
+    i = _skip(s, i)
+    c = s[i:i + 1]
+    if c == '"':
+        end = s.find('"', i + 1)
+        if end < 0 or s.find('\\', i + 1, end) >= 0:
+            raise _NotHandled()
+        return s[i + 1:end], end + 1
+    if c == '{':
+        return _fastValues(s, i + 1, '}')
+    if c == '(':
+        return _fastValues(s, i + 1, ')')
+    m = _number.match(s, i)
+    if m is not None:
+        n = m.group()
+        try:
+            return int(n), m.end()
+        except ValueError:
+            return float(n), m.end()
+    m = _fqident.match(s, i)
+    if m is None:
+        raise _NotHandled()
+    word = m.group()
+    i = m.end()
+    if word == 'true' or word == 'false':
+        return word == 'true', i
+    if word.startswith(('true.', 'false.')):
+        raise _NotHandled()
+    if word == 'NONE' or word == 'SOME':
+        j = _skip(s, i)
+        if not s.startswith('(', j):
+            return word, i
+        if word == 'NONE':
+            return None, _expect(s, j + 1, ')')
+        value, j = _fastValue(s, j + 1)
+        return value, _expect(s, j, ')')
+    if word == 'record':
+        return _fastRecord(s, i)
+    return word, i
+
+
+def _fastParse(string):
+    i = _skip(string, 0)
+    if i == len(string):
+        return None
+    value, i = _fastValue(string, i)
+    if _skip(string, i) != len(string):
+        raise _NotHandled()
+    return value
+
+
+# whole answers common enough (every is* query) to be looked up without parsing
+_primitives = {'true\n': True, 'false\n': False, 'true': True, 'false': False, '\n': None, '': None}
 
 
 def parseString(string):
-    res = omcGrammar.parseString(string)
+    if string in _primitives:
+        return _primitives[string]
+    try:
+        return _fastParse(string)
+    except (_NotHandled, RecursionError):
+        pass
+    res = _getGrammar().parseString(string)
     if len(res) == 0:
       return
     return res[0]
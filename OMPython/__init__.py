@@ -39,22 +39,36 @@ import abc
 import csv
 import getpass
 import logging
-import json
+import math
 import os
+import pickle
 import platform
-import psutil
+import queue
 import re
-import shlex
+import select
 import signal
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import uuid
-import xml.etree.ElementTree as ET
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+# lxml is optional; it parses the model description XML considerably faster
+try:
+    from lxml import etree as ET
+    # large models produce deep/huge init XML files; blank text nodes are never read
+    _ITERPARSE_OPTIONS = {'huge_tree': True, 'remove_blank_text': True}
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _ITERPARSE_OPTIONS = {}
+# orjson is optional; only used to read the output of docker inspect
+try:
+    import orjson as json
+except ImportError:
+    import json
 import numpy as np
-import pyparsing
 import importlib
 
 
@@ -110,17 +124,104 @@ logger_console_handler.setFormatter(logger_formatter)
 logger.addHandler(logger_console_handler)
 logger.setLevel(logging.WARNING)
 
+# dll path line of the .bat file that omc generates next to a model executable on Windows
+_RE_SET_PATH = re.compile(r"^SET PATH=([^%\r\n]*)", re.IGNORECASE | re.MULTILINE)
+# API calls that load or remove classes, and so change the answers to most questions
+_RE_CHANGES_CLASSES = re.compile(r"\b(?:loadFile|loadFiles|loadModel|loadString|loadEncryptedPackage|reloadClass|deleteClass|clear)\s*\(")
+# major and minor number in the output of omc --version
+_RE_OMC_VERSION = re.compile(r"v?([0-9]+)[.]([0-9]+)[.][0-9]+")
+
+def _pidfd_wait(pid, timeout=None):
+    """
+    Block until process pid has exited, without polling, using a pidfd (Linux >= 5.3).
+    Returns True if it has exited, False on timeout, or None if pidfds are not available.
+    """
+    if not hasattr(os, "pidfd_open"):
+        return None
+    try:
+        fd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return None
+    try:
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        return bool(poller.poll(None if timeout is None else timeout * 1000))
+    finally:
+        os.close(fd)
+
+
+def _wait_process(process, timeout):
+    """
+    Like process.wait(timeout), but for our own children block on a pidfd where
+    possible instead of Popen.wait's sleep loop. Raises subprocess.TimeoutExpired.
+    """
+    if isinstance(process, subprocess.Popen) and process.returncode is None:
+        if _pidfd_wait(process.pid, timeout) is False:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+    return process.wait(timeout=timeout)
+
+
 class DummyPopen():
+  """
+  Popen-like handle for an omc process that is not our child (it runs in docker).
+  Liveness is checked with signal 0, which is a single syscall; POSIX only.
+  Raises ProcessLookupError if there is no process with this pid.
+  """
   def __init__(self, pid):
     self.pid = pid
-    self.process = psutil.Process(pid)
     self.returncode = 0
+    if not self._alive():
+      raise ProcessLookupError(pid)
+  def _alive(self):
+    try:
+      os.kill(self.pid, 0)
+    except ProcessLookupError:
+      return False
+    except PermissionError:
+      # exists, but belongs to another user (e.g. root inside the container)
+      pass
+    return True
   def poll(self):
-    return None if self.process.is_running() else True
+    return None if self._alive() else True
+  def terminate(self):
+    return os.kill(self.pid, signal.SIGTERM)
   def kill(self):
     return os.kill(self.pid, signal.SIGKILL)
-  def wait(self, timeout):
-    return self.process.wait(timeout=timeout)
+  def wait(self, timeout=None):
+    exited = _pidfd_wait(self.pid, timeout)
+    if exited is False:
+      raise subprocess.TimeoutExpired(str(self.pid), timeout)
+    if exited:
+      return self.returncode
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while self._alive():
+      if deadline is not None and time.monotonic() >= deadline:
+        raise subprocess.TimeoutExpired(str(self.pid), timeout)
+      time.sleep(0.01)
+    return self.returncode
+
+
+def _source_mtime(path):
+    """
+    Latest modification time (ns) of a Modelica source: the file itself or, for a package
+    stored as a directory (package.mo), anything below that directory. None if it cannot be read.
+    """
+    try:
+        latest = os.stat(path).st_mtime_ns
+        if os.path.basename(path) != "package.mo":
+            return latest
+        for root, dirs, files in os.walk(os.path.dirname(path)):
+            # the directory's own mtime changes when files are added or removed
+            latest = max([latest, os.stat(root).st_mtime_ns] + [os.stat(os.path.join(root, f)).st_mtime_ns for f in files])
+        return latest
+    except (OSError, TypeError):
+        return None
+
+
+# omhome found via shutil.which("omc"), by the value of PATH it was found with
+_omhome_by_path = {}
 
 
 class OMCSessionHelper:
@@ -138,10 +239,16 @@ class OMCSessionHelper:
             self.omhome = omhome
             return
 
-        # Get the path to the OMC executable, if not installed this will be None
-        path_to_omc = shutil.which("omc")
-        if path_to_omc is not None:
-            self.omhome = os.path.dirname(os.path.dirname(path_to_omc))
+        # Get the path to the OMC executable, if not installed this will be None;
+        # shutil.which stats every PATH entry, so remember the answer for this PATH
+        searchPath = os.environ.get('PATH')
+        omhome = _omhome_by_path.get(searchPath)
+        if omhome is None:
+            path_to_omc = shutil.which("omc")
+            if path_to_omc is not None:
+                omhome = _omhome_by_path[searchPath] = os.path.dirname(os.path.dirname(path_to_omc))
+        if omhome is not None:
+            self.omhome = omhome
             return
 
         raise ValueError("Cannot find OpenModelica executable, please install from openmodelica.org")
@@ -150,8 +257,8 @@ class OMCSessionHelper:
         try:
             return os.path.join(self.omhome, 'bin', 'omc')
         except BaseException:
-            logger.error("The OpenModelica compiler is missing in the System path (%s), please install it"
-                         % os.path.join(self.omhome, 'bin', 'omc'))
+            logger.error("The OpenModelica compiler is missing in the System path (%s), please install it",
+                         os.path.join(self.omhome, 'bin', 'omc'))
             raise
 
 
@@ -159,11 +266,15 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
 
     def __init__(self, readonly=False):
         self.readonly = readonly
-        self.omc_cache = {}
+        # least recently used entries are dropped once omc_cache_size is exceeded
+        self.omc_cache = OrderedDict()
+        self.omc_cache_size = 4096
+        self._cache_path = None  # file the readonly cache is persisted to, see _loadCache()/_saveCache()
         self._omc_process = None
         self._omc_command = None
         self._omc = None
         self._dockerCid = None
+        self._dockerPidNamespace = None  # see _docker_pid_namespace()
         self._serverIPAddress = "127.0.0.1"
         self._interactivePort = None
         # FIXME: this code is not well written... need to be refactored
@@ -186,27 +297,25 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
         except:
           pass
         self._omc_log_file.close()
-        if sys.version_info.major >= 3:
-          try:
-            self._omc_process.wait(timeout=2.0)
-          except:
-            if self._omc_process:
-              self._omc_process.kill()
-        else:
-          for i in range(0,100):
-            time.sleep(0.02)
-            if self._omc_process and (self._omc_process.poll() is not None):
-              break
-        # kill self._omc_process process if it is still running/exists
-        if self._omc_process is not None and self._omc_process.returncode is None:
-            print("OMC did not exit after being sent the quit() command; killing the process with pid=%s" % str(self._omc_process.pid))
-            if sys.platform=="win32":
-                self._omc_process.kill()
-                self._omc_process.wait()
+        if self._omc_process is None:
+            return
+        try:
+            _wait_process(self._omc_process, 2.0)
+            return
+        except Exception:
+            pass
+        # terminate self._omc_process if it is still running, and kill it if that does not help either
+        print("OMC did not exit after being sent the quit() command; killing the process with pid=%s" % str(self._omc_process.pid))
+        try:
+            if sys.platform != "win32" and isinstance(self._omc_process, subprocess.Popen):
+                # omc is the leader of its own process group; stop anything it started as well
+                os.killpg(self._omc_process.pid, signal.SIGTERM)
             else:
-                os.killpg(os.getpgid(self._omc_process.pid), signal.SIGTERM)
-                self._omc_process.kill()
-                self._omc_process.wait()
+                self._omc_process.terminate()
+            _wait_process(self._omc_process, 2.0)
+        except Exception:
+            self._omc_process.kill()
+            self._omc_process.wait()
 
     def _create_omc_log_file(self, suffix):
         if sys.platform == 'win32':
@@ -215,58 +324,152 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
             # this file must be closed in the destructor
             self._omc_log_file = open(os.path.join(self._temp_dir, "openmodelica.{0}.{1}.{2}.log".format(self._currentUser, suffix, self._random_string)), 'w')
 
+    def _omc_log_tail(self, maxBytes=65536):
+        """
+        Return the end (at most maxBytes) of the omc log file, to be quoted in error messages.
+        """
+        with open(self._omc_log_file.name, 'rb') as fin:
+            fin.seek(0, os.SEEK_END)
+            fin.seek(max(0, fin.tell() - maxBytes))
+            return fin.read().decode(errors='replace')
+
     def _start_omc_process(self, timeout):
         if sys.platform == 'win32':
             omhome_bin = os.path.join(self.omhome, 'bin').replace("\\", "/")
-            my_env = os.environ.copy()
-            my_env["PATH"] = omhome_bin + os.pathsep + my_env["PATH"]
+            my_env = {**os.environ, "PATH": omhome_bin + os.pathsep + os.environ["PATH"]}
             self._omc_process = subprocess.Popen(self._omc_command, stdout=self._omc_log_file, stderr=self._omc_log_file, env=my_env)
         else:
             # set the user environment variable so omc running from wsgi has the same user as OMPython
-            my_env = os.environ.copy()
-            my_env["USER"] = self._currentUser
-            # Because we spawned a shell, and we need to be able to kill OMC, create a new process group for this
-            self._omc_process = subprocess.Popen(self._omc_command, shell=True, stdout=self._omc_log_file, stderr=self._omc_log_file, env=my_env, preexec_fn=os.setsid)
+            my_env = {**os.environ, "USER": self._currentUser}
+            # We need to be able to kill OMC (and anything it spawns), so start it in a new process group
+            self._omc_process = subprocess.Popen(self._omc_command, stdout=self._omc_log_file, stderr=self._omc_log_file, env=my_env, start_new_session=True)
         if self._docker:
-          for i in range(0,40):
-            try:
-              with open(self._dockerCidFile, "r") as fin:
-                self._dockerCid = fin.read().strip()
-            except:
-              pass
-            if self._dockerCid:
-              break
-            time.sleep(timeout / 40.0)
+          # stop waiting early if docker run fails, e.g. because the image cannot be pulled
+          self._dockerCid = self._wait_for(self._read_docker_cid_file, timeout, process=self._omc_process)
           try:
             os.remove(self._dockerCidFile)
           except:
             pass
           if self._dockerCid is None:
-            logger.error("Docker did not start. Log-file says:\n%s" % (open(self._omc_log_file.name).read()))
+            logger.error("Docker did not start. Log-file says:\n%s", self._omc_log_tail())
             raise Exception("Docker did not start (timeout=%f might be too short especially if you did not docker pull the image before this command)." % timeout)
         if self._docker or self._dockerContainer:
           if self._dockerNetwork == "separate":
-            self._serverIPAddress = json.loads(subprocess.check_output(["docker", "inspect", self._dockerCid]).decode().strip())[0]["NetworkSettings"]["IPAddress"]
-          for i in range(0,40):
-            if sys.platform == 'win32':
-              break
-            dockerTop = subprocess.check_output(["docker", "top", self._dockerCid]).decode().strip()
-            self._omc_process = None
-            for line in dockerTop.split("\n"):
-              columns = line.split()
-              if self._random_string in line:
-                try:
-                  self._omc_process = DummyPopen(int(columns[1]))
-                except psutil.NoSuchProcess:
-                  raise Exception("Could not find PID %d - is this a docker instance spawned without --pid=host?\nLog-file says:\n%s" % (self._random_string, dockerTop, open(self._omc_log_file.name).read()))
-                break
-            if self._omc_process is not None:
-              break
-            time.sleep(timeout / 40.0)
-          if self._omc_process is None:
-            raise Exception("Docker top did not contain omc process %s:\n%s\nLog-file says:\n%s" % (self._random_string, dockerTop, open(self._omc_log_file.name).read()))
+            self._serverIPAddress = json.loads(subprocess.check_output(["docker", "inspect", self._dockerCid]))[0]["NetworkSettings"]["IPAddress"]
+          if sys.platform != 'win32':
+            dockerTop = ""  # the last output of docker top, quoted if omc is not found
+
+            def dockerTopPid():
+              nonlocal dockerTop
+              dockerTop = subprocess.check_output(["docker", "top", self._dockerCid]).decode().strip()
+              for line in dockerTop.split("\n"):
+                if self._random_string in line:
+                  return int(line.split()[1])
+              return None
+
+            # reading /proc is much cheaper than forking a docker client for docker top, so
+            # try that first; docker top also sees an omc whose pid is not visible from here,
+            # so it is asked too once a short grace period has passed, at most twice a second
+            useProc = os.path.isdir("/proc")
+            nextTop = time.monotonic() + (min(1.0, timeout / 4) if useProc else 0.0)
+
+            def findOmcPid():
+              nonlocal nextTop
+              omcPid = self._find_omc_pid() if useProc else None
+              if omcPid is None and time.monotonic() >= nextTop:
+                nextTop = time.monotonic() + 0.5
+                omcPid = dockerTopPid()
+              return omcPid
+
+            omcPid = self._wait_for(findOmcPid, timeout)
+            if omcPid is None:
+              raise Exception("Docker top did not contain omc process %s:\n%s\nLog-file says:\n%s" % (self._random_string, dockerTop, self._omc_log_tail()))
+            try:
+              self._omc_process = DummyPopen(omcPid)
+            except ProcessLookupError:
+              raise Exception("Could not find PID %d - is this a docker instance spawned without --pid=host?\nLog-file says:\n%s" % (omcPid, self._omc_log_tail()))
         return self._omc_process
 
+    def _wait_for(self, read, timeout, process=None):
+        """
+        Call read() until it returns something other than None, for at most timeout seconds.
+        Returns that value, or None if it never did. The pause between attempts starts at 1 ms
+        and backs off to 0.1 s, so an omc that starts quickly is noticed quickly.
+        If process is given, waiting ends as soon as it exits: read() is tried once
+        more and the loop gives up instead of sleeping through the rest of the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while True:
+            value = read()
+            if value is not None:
+                return value
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            pause = min(delay, remaining)
+            delay = min(delay * 1.5, 0.1)
+            if process is None:
+                time.sleep(pause)
+                continue
+            try:
+                _wait_process(process, pause)
+            except subprocess.TimeoutExpired:
+                continue
+            return read()
+
+    def _read_docker_cid_file(self):
+        """
+        Return the container id written by docker run --cidfile, or None if it is not there yet.
+        """
+        try:
+            with open(self._dockerCidFile, "r") as fin:
+                return fin.read().strip() or None
+        except OSError:
+            return None
+
+    def _find_omc_pid(self):
+        """
+        Return the pid of this session's omc in docker, looked up in /proc, or None if it is not
+        running (yet). The process must have the session's random string on its command line, be
+        named like dockerOpenModelicaPath and, where that can be read, run in the container's pid
+        namespace; so neither the docker client nor a wrapper around it is taken for omc.
+        """
+        needle = self._random_string.encode()
+        omcName = os.path.basename(self._dockerOpenModelicaPath).encode()
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit() or int(entry) == self._omc_process.pid:
+                continue
+            try:
+                with open(os.path.join("/proc", entry, "cmdline"), "rb") as fin:
+                    cmdline = fin.read()
+            except OSError:
+                continue
+            if needle not in cmdline or os.path.basename(cmdline.split(b"\0", 1)[0]) != omcName:
+                continue
+            namespace = self._docker_pid_namespace()
+            if namespace is not None:
+                try:
+                    if os.readlink(os.path.join("/proc", entry, "ns", "pid")) != namespace:
+                        continue
+                except OSError:
+                    continue
+            return int(entry)
+        return None
+
+    def _docker_pid_namespace(self):
+        """
+        Return the pid namespace of the docker container (e.g. 'pid:[4026532301]') from the pid of
+        its init process, or None if that cannot be read from here (e.g. it runs as another user).
+        """
+        if self._dockerPidNamespace is None:
+            try:
+                initPid = subprocess.check_output(["docker", "inspect", "-f", "{{.State.Pid}}", self._dockerCid], stderr=subprocess.DEVNULL).decode().strip()
+                self._dockerPidNamespace = os.readlink(os.path.join("/proc", initPid, "ns", "pid"))
+            except (subprocess.SubprocessError, OSError):
+                pass
+        return self._dockerPidNamespace
+
     def _getuid(self):
       """
       The uid to give to docker.
@@ -278,9 +481,8 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
     def _set_omc_command(self, omc_path_and_args_list):
         """Define the command that will be called by the subprocess module.
 
-        On Windows, use the list input style of the subprocess module to
-        avoid problems resulting from spaces in the path string.
-        Linux, however, only works with the string version.
+        The command is kept as an argument list and started without a shell,
+        which avoids problems resulting from spaces in the path string.
         """
         if (self._docker or self._dockerContainer) and sys.platform == "win32":
             extraFlags = ["-d=zmqDangerousAcceptConnectionsFromAnywhere"]
@@ -310,11 +512,7 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
             extraFlags = extraFlags + ["--interactivePort=%d" % int(self._interactivePort)]
 
         omc_path_and_args_list = omcCommand + omc_path_and_args_list + extraFlags
-
-        if sys.platform == 'win32':
-            self._omc_command = omc_path_and_args_list
-        else:
-            self._omc_command = ' '.join([shlex.quote(a) if (sys.version_info > (3, 0)) else a for a in omc_path_and_args_list])
+        self._omc_command = omc_path_and_args_list
 
         return self._omc_command
 
@@ -353,17 +551,18 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
     def ask(self, question, opt=None, parsed=True):
         p = (question, opt, parsed)
 
-        if self.readonly and question != 'getErrorString':
-            # can use cache if readonly
-            if p in self.omc_cache:
-                return self.omc_cache[p]
+        # can use cache if readonly; loading classes must always reach omc
+        useCache = self.readonly and question != 'getErrorString' and not _RE_CHANGES_CLASSES.match(question + '(')
+        if useCache and p in self.omc_cache:
+            self.omc_cache.move_to_end(p)
+            return self.omc_cache[p]
 
         if opt:
-            expression = '{0}({1})'.format(question, opt)
+            expression = f'{question}({opt})'
         else:
             expression = question
 
-        logger.debug('OMC ask: {0}  - parsed: {1}'.format(expression, parsed))
+        logger.debug('OMC ask: %s  - parsed: %s', expression, parsed)
 
         try:
             if parsed:
@@ -371,56 +570,213 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
             else:
                 res = self.sendExpression(expression, parsed=False)
         except Exception as e:
-            logger.error("OMC failed: {0}, {1}, parsed={2}".format(question, opt, parsed))
+            logger.error("OMC failed: %s, %s, parsed=%s", question, opt, parsed)
             raise e
 
-        # save response
-        self.omc_cache[p] = res
+        # save response; only readonly sessions ever read it back
+        if useCache:
+            self._cacheResponse(p, res)
+
+        return res
+
+    def _cacheKey(self):
+        """
+        What persisted answers depend on: the omc version, the loaded libraries, and the
+        source files of all loaded classes with their modification times. Returns None if
+        a source cannot be checked from here (e.g. classes from loadString, or omc running
+        in docker); then no answers are persisted or reused.
+        """
+        try:
+            sourceFiles = self.sendExpression("{getSourceFile(c) for c in getClassNames()}")
+        except Exception:
+            return None
+        stamps = []
+        for sourceFile in sourceFiles:
+            mtime = _source_mtime(sourceFile)
+            if mtime is None:
+                return None
+            stamps.append((sourceFile, mtime))
+        return (self.sendExpression("getVersion()"), self.sendExpression("getLoadedLibraries()"), tuple(sorted(stamps)))
+
+    def _loadCache(self):
+        """
+        Fill omc_cache from the file given as cache_path, if the session is readonly
+        and the file was written for the same omc version and loaded libraries.
+        """
+        if not (self.readonly and self._cache_path):
+            return
+        try:
+            with open(self._cache_path, 'rb') as fin:
+                key, entries = pickle.load(fin)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return
+        if key is not None and key == self._cacheKey():
+            for p, res in entries.items():
+                self._cacheResponse(p, res)
+
+    def _saveCache(self):
+        """
+        Write omc_cache to cache_path so that a later readonly session can reuse it.
+        """
+        if not (self.readonly and self._cache_path and self.omc_cache):
+            return
+        entries = dict(self.omc_cache)
+        key = self._cacheKey()
+        if key is None:
+            return
+        tmp = self._cache_path + "." + self._random_string
+        try:
+            with open(tmp, 'wb') as fout:
+                pickle.dump((key, entries), fout)
+            os.replace(tmp, self._cache_path)
+        except Exception as ex:
+            logger.warning("Could not write the OMC cache to %s: %s", self._cache_path, ex)
+
+    def _cacheResponse(self, key, value):
+        self.omc_cache[key] = value
+        self.omc_cache.move_to_end(key)
+        if len(self.omc_cache) > self.omc_cache_size:
+            self.omc_cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Forget all cached answers."""
+        self.omc_cache.clear()
+
+    def _forgetIfLoading(self, command):
+        """
+        Called with every command sent: if it loads or removes classes, forget the cached
+        answers and pick up the persisted ones written for the new set of classes, if any.
+        """
+        if (self.omc_cache or (self.readonly and self._cache_path)) and _RE_CHANGES_CLASSES.search(command):
+            self.clear_cache()
+            self._loadCache()
+
+    def invalidate(self, question):
+        """Forget the cached answers to one question, e.g. invalidate('getComponents')."""
+        for p in [p for p in self.omc_cache if p[0] == question]:
+            del self.omc_cache[p]
+
+    def ask_many(self, question, opts):
+        """
+        Ask the same question for several arguments in one round-trip, e.g.
+        ask_many('isPackage', ['Modelica', 'Modelica.Blocks']) sends
+        {isPackage(Modelica), isPackage(Modelica.Blocks)} and returns the
+        typed results as a list, in the order of opts.
+        OMC arrays must be homogeneous, so if the combined expression fails
+        (e.g. ragged results) every question is sent on its own instead.
+        """
+        opts = list(opts)
+        results = [None] * len(opts)
+        pending = []
+        for i, opt in enumerate(opts):
+            # typed answers are cached apart from ask(), which may return unparsed strings
+            p = (question, opt, 'typed')
+            if self.readonly and p in self.omc_cache:
+                self.omc_cache.move_to_end(p)
+                results[i] = self.omc_cache[p]
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+
+        expressions = [f'{question}({opts[i]})' for i in pending]
+        logger.debug('OMC ask_many: %s (%d expressions)', question, len(expressions))
+        try:
+            answers = self.sendExpression('{' + ', '.join(expressions) + '}')
+        except Exception:
+            answers = None
+        if not isinstance(answers, (list, tuple)) or len(answers) != len(pending):
+            answers = [self.sendExpression(expression) for expression in expressions]
+
+        for i, answer in zip(pending, answers):
+            if self.readonly:
+                self._cacheResponse((question, opts[i], 'typed'), answer)
+            results[i] = answer
+        return results
+
+    def _ask_bool(self, question, opt=None):
+        # the answer is just true or false; no need to run a parser over it
+        return self.ask(question, opt, parsed=False).strip() == 'true'
+
+    def _ask_int(self, question, opt=None):
+        return int(self.ask(question, opt, parsed=False))
+
+    def _ask_all(self, question, countQuestion, className):
+        """
+        Ask question(className, i) for i in 1:countQuestion(className) as a single
+        array comprehension, so that omc answers in one round-trip instead of 1 + n.
+        """
+        p = (question, className, 'all')
+        if self.readonly and p in self.omc_cache:
+            self.omc_cache.move_to_end(p)
+            return self.omc_cache[p]
 
+        expression = f'{{{question}({className}, i) for i in 1:{countQuestion}({className})}}'
+        logger.debug('OMC ask_all: %s', expression)
+        try:
+            res = self.sendExpression(expression)
+        except Exception:
+            res = None
+        if isinstance(res, (list, tuple)):
+            res = list(res)
+        else:
+            # do not leave the error of the combined expression for the caller's next getErrorString()
+            logger.debug('OMC ask_all: falling back to one query per item: %s', self.sendExpression('getErrorString()'))
+            try:
+                count = self._ask_int(countQuestion, className)
+            except ValueError:
+                # e.g. className does not exist; omc answers with an error instead of a number
+                logger.warning("Method '%s' failed for %s: %s", countQuestion, className, self.sendExpression('getErrorString()'))
+                return []
+            res = [self.sendExpression(f'{question}({className}, {i})') for i in range(1, count + 1)]
+
+        if self.readonly:
+            self._cacheResponse(p, res)
         return res
 
     # TODO: Open Modelica Compiler API functions. Would be nice to generate these.
     def loadFile(self, filename):
-        return self.ask('loadFile', '"{0}"'.format(filename))
+        # sendExpression drops the cached answers, which depend on the loaded classes
+        return self.ask('loadFile', f'"{filename}"')
 
     def loadModel(self, className):
         return self.ask('loadModel', className)
 
     def isModel(self, className):
-        return self.ask('isModel', className)
+        return self._ask_bool('isModel', className)
 
     def isPackage(self, className):
-        return self.ask('isPackage', className)
+        return self._ask_bool('isPackage', className)
 
     def isPrimitive(self, className):
-        return self.ask('isPrimitive', className)
+        return self._ask_bool('isPrimitive', className)
 
     def isConnector(self, className):
-        return self.ask('isConnector', className)
+        return self._ask_bool('isConnector', className)
 
     def isRecord(self, className):
-        return self.ask('isRecord', className)
+        return self._ask_bool('isRecord', className)
 
     def isBlock(self, className):
-        return self.ask('isBlock', className)
+        return self._ask_bool('isBlock', className)
 
     def isType(self, className):
-        return self.ask('isType', className)
+        return self._ask_bool('isType', className)
 
     def isFunction(self, className):
-        return self.ask('isFunction', className)
+        return self._ask_bool('isFunction', className)
 
     def isClass(self, className):
-        return self.ask('isClass', className)
+        return self._ask_bool('isClass', className)
 
     def isParameter(self, className):
-        return self.ask('isParameter', className)
+        return self._ask_bool('isParameter', className)
 
     def isConstant(self, className):
-        return self.ask('isConstant', className)
+        return self._ask_bool('isConstant', className)
 
     def isProtected(self, className):
-        return self.ask('isProtected', className)
+        return self._ask_bool('isProtected', className)
 
     def getPackages(self, className="AllLoadedClasses"):
         return self.ask('getPackages', className)
@@ -432,7 +788,7 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
         return self.ask('getDerivedClassModifierNames', className)
 
     def getDerivedClassModifierValue(self, className, modifierName):
-        return self.ask('getDerivedClassModifierValue', '{0}, {1}'.format(className, modifierName))
+        return self.ask('getDerivedClassModifierValue', f'{className}, {modifierName}')
 
     def typeNameStrings(self, className):
         return self.ask('typeNameStrings', className)
@@ -443,80 +799,85 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
     def getClassComment(self, className):
         try:
             return self.ask('getClassComment', className)
-        except pyparsing.ParseException as ex:
-            logger.warning("Method 'getClassComment' failed for {0}".format(className))
-            logger.warning('OMTypedParser error: {0}'.format(ex.message))
+        except OMTypedParser.ParseException as ex:
+            logger.warning("Method 'getClassComment' failed for %s", className)
+            logger.warning('OMTypedParser error: %s', ex.message)
             return 'No description available'
 
     def getNthComponent(self, className, comp_id):
         """ returns with (type, name, description) """
-        return self.ask('getNthComponent', '{0}, {1}'.format(className, comp_id))
+        return self.ask('getNthComponent', f'{className}, {comp_id}')
 
     def getNthComponentAnnotation(self, className, comp_id):
-        return self.ask('getNthComponentAnnotation', '{0}, {1}'.format(className, comp_id))
+        return self.ask('getNthComponentAnnotation', f'{className}, {comp_id}')
 
     def getImportCount(self, className):
-        return self.ask('getImportCount', className)
+        return self._ask_int('getImportCount', className)
 
     def getNthImport(self, className, importNumber):
         # [Path, id, kind]
-        return self.ask('getNthImport', '{0}, {1}'.format(className, importNumber))
+        return self.ask('getNthImport', f'{className}, {importNumber}')
+
+    def getAllImports(self, className):
+        """ returns with [[Path, id, kind], ...] for all imports of className """
+        return self._ask_all('getNthImport', 'getImportCount', className)
 
     def getInheritanceCount(self, className):
-        return self.ask('getInheritanceCount', className)
+        return self._ask_int('getInheritanceCount', className)
 
     def getNthInheritedClass(self, className, inheritanceDepth):
-        return self.ask('getNthInheritedClass', '{0}, {1}'.format(className, inheritanceDepth))
+        return self.ask('getNthInheritedClass', f'{className}, {inheritanceDepth}')
+
+    def getAllInheritedClasses(self, className):
+        return self._ask_all('getNthInheritedClass', 'getInheritanceCount', className)
 
     def getParameterNames(self, className):
         try:
             return self.ask('getParameterNames', className)
         except KeyError as ex:
-            logger.warning('OMPython error: {0}'.format(ex))
+            logger.warning('OMPython error: %s', ex)
             # FIXME: OMC returns with a different structure for empty parameter set
             return []
 
     def getParameterValue(self, className, parameterName):
         try:
-            return self.ask('getParameterValue', '{0}, {1}'.format(className, parameterName))
-        except pyparsing.ParseException as ex:
-            logger.warning('OMTypedParser error: {0}'.format(ex.message))
+            return self.ask('getParameterValue', f'{className}, {parameterName}')
+        except OMTypedParser.ParseException as ex:
+            logger.warning('OMTypedParser error: %s', ex.message)
             return ""
 
     def getComponentModifierNames(self, className, componentName):
-        return self.ask('getComponentModifierNames', '{0}, {1}'.format(className, componentName))
+        return self.ask('getComponentModifierNames', f'{className}, {componentName}')
 
     def getComponentModifierValue(self, className, componentName):
         try:
             # FIXME: OMPython exception UnboundLocalError exception for 'Modelica.Fluid.Machines.ControlledPump'
-            return self.ask('getComponentModifierValue', '{0}, {1}'.format(className, componentName))
-        except pyparsing.ParseException as ex:
-            logger.warning('OMTypedParser error: {0}'.format(ex.message))
-            result = self.ask('getComponentModifierValue', '{0}, {1}'.format(className, componentName), parsed=False)
+            return self.ask('getComponentModifierValue', f'{className}, {componentName}')
+        except OMTypedParser.ParseException as ex:
+            logger.warning('OMTypedParser error: %s', ex.message)
+            result = self.ask('getComponentModifierValue', f'{className}, {componentName}', parsed=False)
             try:
-                answer = OMParser.check_for_values(result)
-                OMParser.result = {}
+                answer = OMParser.parse_values(result)
                 return answer[2:]
             except (TypeError, UnboundLocalError) as ex:
-                logger.warning('OMParser error: {0}'.format(ex))
+                logger.warning('OMParser error: %s', ex)
                 return result
 
     def getExtendsModifierNames(self, className, componentName):
-        return self.ask('getExtendsModifierNames', '{0}, {1}'.format(className, componentName))
+        return self.ask('getExtendsModifierNames', f'{className}, {componentName}')
 
     def getExtendsModifierValue(self, className, extendsName, modifierName):
         try:
             # FIXME: OMPython exception UnboundLocalError exception for 'Modelica.Fluid.Machines.ControlledPump'
-            return self.ask('getExtendsModifierValue', '{0}, {1}, {2}'.format(className, extendsName, modifierName))
-        except pyparsing.ParseException as ex:
-            logger.warning('OMTypedParser error: {0}'.format(ex.message))
-            result = self.ask('getExtendsModifierValue', '{0}, {1}, {2}'.format(className, extendsName, modifierName), parsed=False)
+            return self.ask('getExtendsModifierValue', f'{className}, {extendsName}, {modifierName}')
+        except OMTypedParser.ParseException as ex:
+            logger.warning('OMTypedParser error: %s', ex.message)
+            result = self.ask('getExtendsModifierValue', f'{className}, {extendsName}, {modifierName}', parsed=False)
             try:
-                answer = OMParser.check_for_values(result)
-                OMParser.result = {}
+                answer = OMParser.parse_values(result)
                 return answer[2:]
             except (TypeError, UnboundLocalError) as ex:
-                logger.warning('OMParser error: {0}'.format(ex))
+                logger.warning('OMParser error: %s', ex)
                 return result
 
     def getNthComponentModification(self, className, comp_id):
@@ -524,7 +885,7 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
 
         # get {$Code(....)} field
         # \{\$Code\((\S*\s*)*\)\}
-        value = self.ask('getNthComponentModification', '{0}, {1}'.format(className, comp_id), parsed=False)
+        value = self.ask('getNthComponentModification', f'{className}, {comp_id}', parsed=False)
         value = value.replace("{$Code(", "")
         return value[:-3]
         # return self.re_Code.findall(value)
@@ -540,16 +901,13 @@ class OMCSessionBase(with_metaclass(abc.ABCMeta, object)):
     # end getClassNames;
     def getClassNames(self, className=None, recursive=False, qualified=False, sort=False, builtin=False,
                       showProtected=False):
-        if className:
-            value = self.ask('getClassNames',
-                             '{0}, recursive={1}, qualified={2}, sort={3}, builtin={4}, showProtected={5}'.format(
-                                 className, str(recursive).lower(), str(qualified).lower(), str(sort).lower(),
-                                 str(builtin).lower(), str(showProtected).lower()))
-        else:
-            value = self.ask('getClassNames',
-                             'recursive={0}, qualified={1}, sort={2}, builtin={3}, showProtected={4}'.format(
-                                 str(recursive).lower(), str(qualified).lower(), str(sort).lower(),
-                                 str(builtin).lower(), str(showProtected).lower()))
+        opts = [className] if className else []
+        opts += ['recursive=true' if recursive else 'recursive=false',
+                 'qualified=true' if qualified else 'qualified=false',
+                 'sort=true' if sort else 'sort=false',
+                 'builtin=true' if builtin else 'builtin=false',
+                 'showProtected=true' if showProtected else 'showProtected=false']
+        value = self.ask('getClassNames', ', '.join(opts))
         return value
 
 
@@ -569,7 +927,9 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
             self._port_file = "openmodelica." + self._currentUser + ".objid." + self._random_string
         else:
             self._port_file = "openmodelica.objid." + self._random_string
-        self._port_file = os.path.join("/tmp" if (docker or dockerContainer) else self._temp_dir, self._port_file).replace("\\", "/")
+        self._port_file = os.path.join("/tmp" if (docker or dockerContainer) else self._temp_dir, self._port_file)
+        if sys.platform == 'win32':
+            self._port_file = self._port_file.replace("\\", "/")
         # set omc executable path and args
         self._docker = docker
         self._dockerContainer = dockerContainer
@@ -600,12 +960,14 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
           self._omc_process.kill()
           raise
         self._omc_corba_uri = "file:///" + self._port_file
+        # the same docker command is retried until omc has written the file
+        catPortFile = ["docker", "exec", self._dockerCid, "cat", self._port_file]
         # See if the omc server is running
         attempts = 0
         while True:
             if self._dockerCid:
                 try:
-                    self._ior = subprocess.check_output(["docker", "exec", self._dockerCid, "cat", self._port_file], stderr=subprocess.DEVNULL if (sys.version_info > (3, 0)) else subprocess.STDOUT).decode().strip()
+                    self._ior = subprocess.check_output(catPortFile, stderr=subprocess.DEVNULL if (sys.version_info > (3, 0)) else subprocess.STDOUT).decode().strip()
                     break
                 except subprocess.CalledProcessError:
                     pass
@@ -616,10 +978,8 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
                 break
             attempts += 1
             if attempts == 80:
-                name = self._omc_log_file.name
                 self._omc_log_file.close()
-                with open(name) as fin:
-                  contents = fin.read()
+                contents = self._omc_log_tail()
                 self._omc_process.kill()
                 raise Exception("OMC Server is down (timeout=%f). Please start it! If the OMC version is old, try OMCSession(..., serverFlag='-d=interactiveCorba') or +d=interactiveCorba. Log-file says:\n%s" % (timeout, contents))
             time.sleep(timeout / 80.0)
@@ -627,7 +987,7 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
         while True:
             if self._dockerCid:
                 try:
-                    self._port = subprocess.check_output(["docker", "exec", self._dockerCid, "cat", self._port_file]).decode().strip()
+                    self._port = subprocess.check_output(catPortFile).decode().strip()
                     break
                 except:
                     pass
@@ -641,13 +1001,12 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
 
             attempts += 1
             if attempts == 80.0:
-                name = self._omc_log_file.name
                 self._omc_log_file.close()
-                logger.error("OMC Server is down (timeout=%f). Please start it! Log-file says:\n%s" % open(name).read())
-                raise Exception("OMC Server is down. Could not open file %s" % (timeout,self._port_file))
+                logger.error("OMC Server is down (timeout=%f). Please start it! Log-file says:\n%s", timeout, self._omc_log_tail())
+                raise Exception("OMC Server is down (timeout=%f). Could not open file %s" % (timeout,self._port_file))
             time.sleep(timeout / 80.0)
 
-        logger.info("OMC Server is up and running at {0}".format(self._omc_corba_uri))
+        logger.info("OMC Server is up and running at %s", self._omc_corba_uri)
         # initialize the ORB with maximum size for the ORB set
         sys.argv.append("-ORBgiopMaxMsgSize")
         sys.argv.append("2147483647")
@@ -667,12 +1026,13 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
     def execute(self, command):
         ## check for process is running
         p=self._omc_process.poll()
-        if (p == None):
+        if (p is None):
             result = self._omc.sendExpression(command)
             if command == "quit()":
                 self._omc = None
                 return result
             else:
+                self._forgetIfLoading(command)
                 answer = OMParser.check_for_values(result)
                 return answer
         else:
@@ -681,12 +1041,13 @@ class OMCSession(OMCSessionHelper, OMCSessionBase):
     def sendExpression(self, command, parsed=True):
         ## check for process is running
         p=self._omc_process.poll()
-        if (p== None):
+        if (p is None):
             result = self._omc.sendExpression(str(command))
             if command == "quit()":
                 self._omc = None
                 return result
             else:
+                self._forgetIfLoading(str(command))
                 if parsed is True:
                     answer = OMTypedParser.parseString(result)
                     return answer
@@ -704,7 +1065,11 @@ class OMCSessionZMQ(OMCSessionHelper, OMCSessionBase):
 
     def __init__(self, readonly=False, timeout = 10.00,
                  docker = None, dockerContainer = None, dockerExtraArgs = None, dockerOpenModelicaPath = "omc",
-                 dockerNetwork = None, port = None, omhome: str = None):
+                 dockerNetwork = None, port = None, omhome: str = None, cache_path: str = None):
+        """
+        cache_path - with readonly=True, answers are kept in this file across sessions
+                     (only load cache files you wrote yourself; they are pickles)
+        """
         if dockerExtraArgs is None:
             dockerExtraArgs = []
 
@@ -722,7 +1087,10 @@ class OMCSessionZMQ(OMCSessionHelper, OMCSessionBase):
         self._dockerNetwork = dockerNetwork
         self._create_omc_log_file("port")
         self._timeout = timeout
-        self._port_file = os.path.join("/tmp" if docker else self._temp_dir, self._port_file).replace("\\", "/")
+        self._omc_pipeline = None  # DEALER socket for sendExpressions(), created on first use
+        self._port_file = os.path.join("/tmp" if docker else self._temp_dir, self._port_file)
+        if sys.platform == 'win32':
+            self._port_file = self._port_file.replace("\\", "/")
         self._interactivePort = port
         # set omc executable path and args
         self._set_omc_command([
@@ -734,40 +1102,67 @@ class OMCSessionZMQ(OMCSessionHelper, OMCSessionBase):
         self._start_omc_process(timeout)
         # connect to the running omc instance using ZMQ
         self._connect_to_omc(timeout)
+        self._cache_path = cache_path
+        self._loadCache()
 
     def __del__(self):
+        try:
+            self._saveCache()
+        except Exception:
+            pass
         OMCSessionBase.__del__(self)
+        # quit() closes it as well, unless omc was gone already
+        if getattr(self, '_omc_pipeline', None) is not None:
+            self._close_pipeline()
+
+    def _read_port_file(self):
+        """
+        Return the ZMQ endpoint written by omc, or None if the port file is not there yet.
+        """
+        try:
+            with open(self._port_file, 'r') as f_p:
+                port = f_p.readline()
+        except OSError:
+            return None
+        if not port:
+            # omc has created the file but not written the endpoint yet
+            return None
+        os.remove(self._port_file)
+        return port
+
+    def _wait_for_docker_port_file(self, timeout):
+        """
+        Return the ZMQ endpoint written by omc inside the container, or None on timeout.
+        The polling runs in a shell inside the container, so this costs one docker exec
+        instead of one per attempt.
+        """
+        # poll every 0.05 s; fractional sleep is not POSIX though (e.g. busybox may not have it),
+        # so where it fails fall back to whole seconds and scale the remaining count accordingly
+        script = ('d=0.05; n=$(($2 * 20)); '
+                  'while [ ! -s "$1" ] && [ $n -gt 0 ]; do '
+                  'if ! sleep $d 2>/dev/null; then d=1; n=$((n / 20)); sleep 1; fi; n=$((n - 1)); '
+                  'done; cat "$1"')
+        seconds = math.ceil(timeout)
+        try:
+            return subprocess.check_output(["docker", "exec", self._dockerCid, "sh", "-c", script, "sh", self._port_file, str(seconds)],
+                                           stderr=subprocess.DEVNULL, timeout=seconds + 10).decode().strip() or None
+        except (subprocess.SubprocessError, OSError):
+            return None
 
     def _connect_to_omc(self, timeout):
         self._omc_zeromq_uri = "file:///" + self._port_file
         # See if the omc server is running
-        attempts = 0
-        self._port = None
-        while True:
-            if self._dockerCid:
-                try:
-                    self._port = subprocess.check_output(["docker", "exec", self._dockerCid, "cat", self._port_file], stderr=subprocess.DEVNULL if (sys.version_info > (3, 0)) else subprocess.STDOUT).decode().strip()
-                    break
-                except:
-                    pass
-            else:
-                if os.path.isfile(self._port_file):
-                    # Read the port file
-                    with open(self._port_file, 'r') as f_p:
-                        self._port = f_p.readline()
-                    os.remove(self._port_file)
-                    break
-
-            attempts += 1
-            if attempts == 80.0:
-                name = self._omc_log_file.name
-                self._omc_log_file.close()
-                logger.error("OMC Server did not start. Please start it! Log-file says:\n%s" % open(name).read())
-                raise Exception("OMC Server did not start (timeout=%f). Could not open file %s" % (timeout,self._port_file))
-            time.sleep(timeout / 80.0)
+        if self._dockerCid:
+            self._port = self._wait_for_docker_port_file(timeout)
+        else:
+            self._port = self._wait_for(self._read_port_file, timeout, process=self._omc_process)
+        if self._port is None:
+            self._omc_log_file.close()
+            logger.error("OMC Server did not start. Please start it! Log-file says:\n%s", self._omc_log_tail())
+            raise Exception("OMC Server did not start (timeout=%f). Could not open file %s" % (timeout,self._port_file))
 
         self._port = self._port.replace("0.0.0.0", self._serverIPAddress)
-        logger.info("OMC Server is up and running at {0} pid={1} cid={2}".format(self._omc_zeromq_uri, self._omc_process.pid, self._dockerCid))
+        logger.info("OMC Server is up and running at %s pid=%s cid=%s", self._omc_zeromq_uri, self._omc_process.pid, self._dockerCid)
 
         # Create the ZeroMQ socket and connect to OMC server
         import zmq
@@ -775,6 +1170,10 @@ class OMCSessionZMQ(OMCSessionHelper, OMCSessionBase):
         self._omc = context.socket(zmq.REQ)
         self._omc.setsockopt(zmq.LINGER, 0) # Dismisses pending messages if closed
         self._omc.setsockopt(zmq.IMMEDIATE, True) # Queue messages only to completed connections
+        self._omc.setsockopt(zmq.SNDTIMEO, int(self._timeout * 1000)) # Give up sending after timeout seconds
+        self._omc.setsockopt(zmq.CONNECT_TIMEOUT, int(self._timeout * 1000)) # Bound each TCP connect attempt
+        self._omc.setsockopt(zmq.TCP_KEEPALIVE, 1) # Keep long idle sessions (e.g. to docker) from being dropped
+        self._omc.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 60)
         self._omc.connect(self._port)
 
     def execute(self, command):
@@ -784,26 +1183,21 @@ class OMCSessionZMQ(OMCSessionHelper, OMCSessionBase):
     def sendExpression(self, command, parsed=True):
         ## check for process is running
         p=self._omc_process.poll()
-        if (p == None):
-            attempts = 0
-            while True:
-                try:
-                    self._omc.send_string(str(command), flags=zmq.NOBLOCK)
-                    break
-                except zmq.error.Again:
-                    pass
-                attempts += 1
-                if attempts == 50.0:
-                    name = self._omc_log_file.name
-                    self._omc_log_file.close()
-                    raise Exception("No connection with OMC (timeout=%f). Log-file says: \n%s" % (self._timeout, open(name).read()))
-                time.sleep(self._timeout / 50.0)
+        if (p is None):
+            # blocks until the message is queued or SNDTIMEO expires
+            try:
+                self._omc.send_string(str(command))
+            except zmq.error.Again:
+                self._omc_log_file.close()
+                raise Exception("No connection with OMC (timeout=%f). Log-file says: \n%s" % (self._timeout, self._omc_log_tail()))
             if command == "quit()":
                 self._omc.close()
                 self._omc = None
+                self._close_pipeline()
                 return None
             else:
                 result = self._omc.recv_string()
+                self._forgetIfLoading(str(command))
                 if parsed is True:
                     answer = OMTypedParser.parseString(result)
                     return answer
@@ -812,11 +1206,133 @@ class OMCSessionZMQ(OMCSessionHelper, OMCSessionBase):
         else:
             raise Exception("Process Exited, No connection with OMC. Create a new instance of OMCSession")
 
+    def _close_pipeline(self):
+        if self._omc_pipeline is not None:
+            self._omc_pipeline.close()
+            self._omc_pipeline = None
+
+    def sendExpressions(self, commands, parsed=True):
+        """
+        Sends several expressions to OpenModelica without waiting for each answer
+        before sending the next one, and returns the answers in the same order
+        (parsed as in sendExpression()). OMC still evaluates them one after the
+        other; only the round-trip latency between them is saved.
+        quit() must be sent through sendExpression().
+        """
+        p = self._omc_process.poll()
+        if p is not None:
+            raise Exception("Process Exited, No connection with OMC. Create a new instance of OMCSession")
+        if self._omc_pipeline is None:
+            self._omc_pipeline = zmq.Context.instance().socket(zmq.DEALER)
+            self._omc_pipeline.setsockopt(zmq.LINGER, 0)
+            self._omc_pipeline.setsockopt(zmq.IMMEDIATE, True)
+            self._omc_pipeline.setsockopt(zmq.SNDTIMEO, int(self._timeout * 1000))
+            self._omc_pipeline.connect(self._port)
+        commands = [str(command) for command in commands]
+        # on any failure, answers to the requests already sent would be read by the next call; start over instead
+        try:
+            for command in commands:
+                # the empty frame is the envelope delimiter a REQ socket would add
+                self._omc_pipeline.send_multipart([b"", command.encode()])
+            results = [self._omc_pipeline.recv_multipart()[-1].decode() for command in commands]
+        except zmq.error.Again:
+            self._close_pipeline()
+            self._omc_log_file.close()
+            raise Exception("No connection with OMC (timeout=%f). Log-file says: \n%s" % (self._timeout, self._omc_log_tail()))
+        except BaseException:
+            self._close_pipeline()
+            raise
+        self._forgetIfLoading("; ".join(commands))
+        if parsed is True:
+            return [OMTypedParser.parseString(result) for result in results]
+        return results
+
+
+class OMCSessionPool(object):
+    """
+    A fixed number of OMCSessionZMQ instances that answer independent queries
+    in parallel. OMC evaluates one expression at a time, so read-only work such
+    as walking a class tree scales with the number of sessions.
+    Every session is a separate omc process: load the libraries you need on all
+    of them with sendExpressionAll() before querying.
+    """
+
+    def __init__(self, n=4, **kwargs):
+        self._sessions = [OMCSessionZMQ(**kwargs) for i in range(n)]
+        self._idle = queue.Queue()
+        for session in self._sessions:
+            self._idle.put(session)
+        self._executor = ThreadPoolExecutor(max_workers=n)
+        self._broadcaster = ThreadPoolExecutor(max_workers=n)
+        self._broadcastLock = threading.Lock()
+
+    def _call(self, method, *args, **kwargs):
+        session = self._idle.get()
+        try:
+            return getattr(session, method)(*args, **kwargs)
+        finally:
+            self._idle.put(session)
+
+    def sendExpression(self, command, parsed=True):
+        """Sends one expression to whichever session is idle."""
+        return self._call('sendExpression', command, parsed)
+
+    def sendExpressions(self, commands, parsed=True):
+        """Spreads the expressions over the sessions and returns the answers in order."""
+        futures = [self._executor.submit(self._call, 'sendExpression', command, parsed) for command in commands]
+        return [future.result() for future in futures]
+
+    def sendExpressionAll(self, command, parsed=True):
+        """Sends the same expression (e.g. loadModel(Modelica)) to every session."""
+        # a session must not be used from two threads at once: wait until each one is idle.
+        # Broadcasts run one at a time, on their own threads, so that they cannot deadlock
+        # with each other or with sendExpressions() tasks waiting for a session.
+        with self._broadcastLock:
+            sessions = [self._idle.get() for session in self._sessions]
+            futures = {}
+            try:
+                for session in sessions:
+                    futures[id(session)] = self._broadcaster.submit(session.sendExpression, command, parsed)
+            finally:
+                # no session may go back to the idle queue while it is still busy, even if one failed
+                wait(futures.values())
+                for session in sessions:
+                    self._idle.put(session)
+            # answers in the order of the sessions, not in the order they became idle
+            return [futures[id(session)].result() for session in self._sessions]
+
+    def close(self):
+        """Waits for pending queries, then stops the omc process of every session."""
+        self._executor.shutdown()
+        self._broadcaster.shutdown()
+        for i in range(len(self._sessions)):
+            # a session still in use by another thread is stopped once it is idle again
+            session = self._idle.get()
+            try:
+                session.sendExpression("quit()")
+            except Exception as ex:
+                logger.warning("Could not send quit() to omc: %s", ex)
+        self._sessions = []
+        self._idle = queue.Queue()
+
 
 class ModelicaSystemError(Exception):
     pass
 
 
+# (quantity key, ScalarVariable attribute) pairs read by ModelicaSystem.xmlparse()
+_SCALAR_VARIABLE_ATTRIBUTES = (
+    ("changeable", "isValueChangeable"),
+    ("description", "description"),
+    ("variability", "variability"),
+    ("causality", "causality"),
+    ("alias", "alias"),
+    ("aliasvariable", "aliasVariable"),
+)
+# attributes read from the type element (Real, Integer, ...) of a ScalarVariable
+_SCALAR_TYPE_ATTRIBUTES = ("start", "min", "max", "unit")
+
+
 class ModelicaSystem(object):
     def __init__(self, fileName=None, modelName=None, lmodel=None,
                  useCorba=False, commandLineOptions=None,
@@ -839,7 +1355,10 @@ class ModelicaSystem(object):
             return
 
         self.tree = None
+        self.root = None  # the root element of self.tree, set by xmlparse()
         self.quantitiesList = []
+        self._quantitiesByName = {}  # name -> entry of quantitiesList
+        self._nonChangeable = set()  # names of quantities with isValueChangeable="false"
         self.paramlist = {}
         self.inputlist = {}
         self.outputlist = {}
@@ -873,6 +1392,8 @@ class ModelicaSystem(object):
             lmodel = []
 
         self.xmlFile = None
+        self.exeFile = None  # model executable, set by buildModel()
+        self._runEnv = None  # environment for running exeFile, see _run_env()
         self.lmodel = lmodel  # may be needed if model is derived from other model
         self.modelName = modelName  # Model class name
         self.fileName = fileName  # Model file/package name
@@ -963,17 +1484,24 @@ class ModelicaSystem(object):
             if not os.path.exists(self.tempdir):
                 raise IOError(self.tempdir, " cannot be created")
 
-        logger.info("Define tempdir as {}".format(self.tempdir))
+        logger.info("Define tempdir as %s", self.tempdir)
         exp = "".join(["cd(", "\"", self.tempdir, "\"", ")"]).replace("\\", "/")
         self.getconn.sendExpression(exp)
 
     def getWorkDirectory(self):
         return self.tempdir
 
-    def _run_cmd(self, cmd: list):
-        logger.debug("Run OM command {} in {}".format(cmd, self.tempdir))
+    def _run_env(self):
+        """
+        Environment for running the model executable. On Windows this is the process environment
+        with the dll path from the generated .bat file prepended to PATH; it is built once per
+        buildModel() instead of on every run. Elsewhere the executable inherits our environment.
+        """
+        if platform.system() != "Windows":
+            # TODO: how to handle path to resources of external libraries for any system not Windows?
+            return None
 
-        if platform.system() == "Windows":
+        if self._runEnv is None:
             dllPath = ""
 
             ## set the process environment from the generated .bat file in windows which should have all the dependencies
@@ -982,15 +1510,18 @@ class ModelicaSystem(object):
                 print("Error: bat does not exist " + batFilePath)
 
             with open(batFilePath, 'r') as file:
-                for line in file:
-                    match = re.match(r"^SET PATH=([^%]*)", line, re.IGNORECASE)
-                    if match:
-                        dllPath = match.group(1).strip(';')  # Remove any trailing semicolons
+                matches = _RE_SET_PATH.findall(file.read())
+            if matches:
+                dllPath = matches[-1].strip(';')  # the last SET PATH wins; remove any trailing semicolons
             my_env = os.environ.copy()
             my_env["PATH"] = dllPath + os.pathsep + my_env["PATH"]
-        else:
-            # TODO: how to handle path to resources of external libraries for any system not Windows?
-            my_env = None
+            self._runEnv = my_env
+        return self._runEnv
+
+    def _run_cmd(self, cmd: list):
+        logger.debug("Run OM command %s in %s", cmd, self.tempdir)
+
+        my_env = self._run_env()
 
         currentDir = os.getcwd()
         try:
@@ -1003,7 +1534,7 @@ class ModelicaSystem(object):
             if stderr:
                 raise ModelicaSystemError("Error running command {}: {}".format(cmd, stderr))
             if self._verbose and stdout:
-                logger.info("OM output for command {}:\n{}".format(cmd, stdout))
+                logger.info("OM output for command %s:\n%s", cmd, stdout)
             p.wait()
             p.terminate()
             os.chdir(currentDir)
@@ -1036,10 +1567,16 @@ class ModelicaSystem(object):
         # buildModelResult=self.getconn.sendExpression("buildModel("+ mName +")")
         buildModelResult = self.requestApi("buildModel", self.modelName, properties=varFilter)
         if self._verbose:
-            logger.info("OM model build result: {}".format(buildModelResult))
+            logger.info("OM model build result: %s", buildModelResult)
         self._check_error()
+        # the .bat file with the dll path is regenerated by buildModel
+        self._runEnv = None
 
         self.xmlFile = os.path.join(os.path.dirname(buildModelResult[0]), buildModelResult[1]).replace("\\", "/")
+        if (platform.system() == "Windows"):
+            self.exeFile = os.path.join(self.tempdir, '{}.{}'.format(self.modelName, "exe")).replace("\\", "/")
+        else:
+            self.exeFile = os.path.join(self.tempdir, self.modelName).replace("\\", "/")
         self.xmlparse()
 
     def sendExpression(self, expr, parsed=True):
@@ -1066,58 +1603,75 @@ class ModelicaSystem(object):
 
     def xmlparse(self):
         if (os.path.exists(self.xmlFile)):
-            self.tree = ET.parse(self.xmlFile)
-            self.root = self.tree.getroot()
-            rootCQ = self.root
-            for attr in rootCQ.iter('DefaultExperiment'):
-                self.simulateOptions["startTime"] = attr.get('startTime')
-                self.simulateOptions["stopTime"] = attr.get('stopTime')
-                self.simulateOptions["stepSize"] = attr.get('stepSize')
-                self.simulateOptions["tolerance"] = attr.get('tolerance')
-                self.simulateOptions["solver"] = attr.get('solver')
-                self.simulateOptions["outputFormat"] = attr.get('outputFormat')
-
-            for sv in rootCQ.iter('ScalarVariable'):
-                scalar = {}
-                scalar["name"] = sv.get('name')
-                scalar["changeable"] = sv.get('isValueChangeable')
-                scalar["description"] = sv.get('description')
-                scalar["variability"] = sv.get('variability')
-                scalar["causality"] = sv.get('causality')
-                scalar["alias"] = sv.get('alias')
-                scalar["aliasvariable"] = sv.get('aliasVariable')
-                ch = list(sv)
-                start = None
-                min = None
-                max = None
-                unit = None
-                for att in ch:
-                    start = att.get('start')
-                    min = att.get('min')
-                    max = att.get('max')
-                    unit = att.get('unit')
-                scalar["start"] = start
-                scalar["min"] = min
-                scalar["max"] = max
-                scalar["unit"] = unit
-
-                if (scalar["variability"] == "parameter"):
-                    if scalar["name"] in self.overridevariables:
-                        self.paramlist[scalar["name"]] = self.overridevariables[scalar["name"]]
-                    else:
-                        self.paramlist[scalar["name"]] = scalar["start"]
-                if (scalar["variability"] == "continuous"):
-                    self.continuouslist[scalar["name"]] = scalar["start"]
-                if (scalar["causality"] == "input"):
-                    self.inputlist[scalar["name"]] = scalar["start"]
-                if (scalar["causality"] == "output"):
-                    self.outputlist[scalar["name"]] = scalar["start"]
+            variabilityLists = {"parameter": self.paramlist, "continuous": self.continuouslist}
+            causalityLists = {"input": self.inputlist, "output": self.outputlist}
+
+            # handle each element as soon as it is parsed, in a single pass; the tree is
+            # still built (and kept as self.tree/self.root, which users may read)
+            context = ET.iterparse(self.xmlFile, events=('end',), **_ITERPARSE_OPTIONS)
+            for event, elem in context:
+                if elem.tag == 'DefaultExperiment':
+                    self.simulateOptions["startTime"] = elem.get('startTime')
+                    self.simulateOptions["stopTime"] = elem.get('stopTime')
+                    self.simulateOptions["stepSize"] = elem.get('stepSize')
+                    self.simulateOptions["tolerance"] = elem.get('tolerance')
+                    self.simulateOptions["solver"] = elem.get('solver')
+                    self.simulateOptions["outputFormat"] = elem.get('outputFormat')
+                    continue
+                if elem.tag != 'ScalarVariable':
+                    continue
+
+                sv = elem
+                a = sv.attrib
+                # names are used as keys in several dicts and looked up repeatedly
+                scalar = {"name": sys.intern(a.get('name'))}
+                for key, attr in _SCALAR_VARIABLE_ATTRIBUTES:
+                    scalar[key] = a.get(attr)
+                # the type element (Real, Integer, ...) is the only child
+                child = next(iter(sv), None)
+                ca = child.attrib if child is not None else {}
+                for key in _SCALAR_TYPE_ATTRIBUTES:
+                    scalar[key] = ca.get(key)
+
+                varList = variabilityLists.get(scalar["variability"])
+                if varList is not None:
+                    varList[scalar["name"]] = scalar["start"]
+                varList = causalityLists.get(scalar["causality"])
+                if varList is not None:
+                    varList[scalar["name"]] = scalar["start"]
 
                 self.quantitiesList.append(scalar)
+                self._quantitiesByName[scalar["name"]] = scalar
+                if scalar["changeable"] == "false":
+                    self._nonChangeable.add(scalar["name"])
+                else:
+                    self._nonChangeable.discard(scalar["name"])
+
+            self.root = context.root
+            self.tree = ET.ElementTree(self.root)
+
+            # parameters overridden before a rebuild keep their overridden value
+            for name, value in self.overridevariables.items():
+                if name in self.paramlist:
+                    self.paramlist[name] = value
         else:
             errstr = "XML file not generated: " + self.xmlFile
             self._raise_error(errstr=errstr)
 
+    def getMethodHelper(self, names, values):
+        """
+        Helper function for getParameters(),getContinuous(),getInputs(),getOutputs(),getSimulationOptions(),getLinearizationOptions(),getOptimizationOptions()
+        names - None, a string or a list of strings given by user
+        values - dict() containing the values of different variables(eg:, parameter,continuous,simulation parameters)
+        """
+        if names is None:
+            return values
+        elif isinstance(names, str):
+            return [values.get(names, "NotExist")]
+        else:
+            get = values.get
+            return [get(x, "NotExist") for x in names]
+
     def getQuantities(self, names=None):  # 3
         """
         This method returns list of dictionaries. It displays details of quantities such as name, value, changeable, and description, where changeable means  if value for corresponding quantity name is changeable or not. It can be called :
@@ -1126,12 +1680,12 @@ class ModelicaSystem(object):
         >>> getQuantities("Name1")
         >>> getQuantities(["Name1","Name2"])
         """
-        if (names == None):
+        if (names is None):
             return self.quantitiesList
         elif (isinstance(names, str)):
-            return [x for x in self.quantitiesList if x["name"] == names]
-        elif isinstance(names, list):
-            return [x for y in names for x in self.quantitiesList if x["name"] == y]
+            return [self._quantitiesByName[names]] if names in self._quantitiesByName else []
+        else:
+            return [self._quantitiesByName[x] for x in names if x in self._quantitiesByName]
 
     def getContinuous(self, names=None):  # 4
         """
@@ -1142,20 +1696,14 @@ class ModelicaSystem(object):
         >>> getContinuous(["Name1","Name2"])
         """
         if not self.simulationFlag:
-            if names is None:
-                return self.continuouslist
-            elif isinstance(names, str):
-                return [self.continuouslist.get(names, "NotExist")]
-            elif isinstance(names, list):
-                return [self.continuouslist.get(x, "NotExist") for x in names]
+            return self.getMethodHelper(names, self.continuouslist)
         else:
             if names is None:
-                for i in self.continuouslist:
-                    try:
-                        value = self.getSolutions(i)
-                        self.continuouslist[i] = value[0][-1]
-                    except Exception:
-                        raise ModelicaSystemError("OM error: {} could not be computed".format(i))
+                varList = list(self.continuouslist)
+                try:
+                    self.continuouslist.update(zip(varList, self._getFinalValues(varList)))
+                except Exception:
+                    raise ModelicaSystemError("OM error: {} could not be computed".format(", ".join(varList)))
                 return self.continuouslist
 
             elif (isinstance(names, str)):
@@ -1166,17 +1714,24 @@ class ModelicaSystem(object):
                 else:
                     raise ModelicaSystemError("OM error: {} is not continuous".format(names))
 
-            elif (isinstance(names, list)):
-                valuelist = []
+            else:
+                names = list(names)
                 for i in names:
-                    if i in self.continuouslist:
-                        value = self.getSolutions(i)
-                        self.continuouslist[i] = value[0][-1]
-                        valuelist.append(value[0][-1])
-                    else:
+                    if i not in self.continuouslist:
                         raise ModelicaSystemError("OM error: {} is not continuous".format(i))
+                valuelist = self._getFinalValues(names)
+                self.continuouslist.update(zip(names, valuelist))
                 return valuelist
 
+    def _getFinalValues(self, varList):
+        """
+        Read the final value of each variable in varList from the result file
+        using a single readSimulationResult() call instead of one per variable.
+        """
+        if not varList:
+            return []
+        return list(self.getSolutions(varList)[:, -1])
+
     def getParameters(self, names=None):  # 5
         """
         This method returns dict. The key is parameter names and value is corresponding parameter value.
@@ -1186,12 +1741,7 @@ class ModelicaSystem(object):
         >>> getParameters("Name1")
         >>> getParameters(["Name1","Name2"])
         """
-        if (names == None):
-            return self.paramlist
-        elif (isinstance(names, str)):
-            return [self.paramlist.get(names, "NotExist")]
-        elif (isinstance(names, list)):
-            return ([self.paramlist.get(x, "NotExist") for x in names])
+        return self.getMethodHelper(names, self.paramlist)
 
     def getlinearParameters(self, names=None):  # 5
         """
@@ -1212,12 +1762,7 @@ class ModelicaSystem(object):
         If *name is None then the function will return dict which contain all input names as key and value as corresponding values. eg., getInputs()
         Otherwise variable number of arguments can be passed as input name in string format separated by commas. eg., getInputs('iName1', 'iName2')
         """
-        if (names == None):
-            return self.inputlist
-        elif (isinstance(names, str)):
-            return [self.inputlist.get(names, "NotExist")]
-        elif (isinstance(names, list)):
-            return ([self.inputlist.get(x, "NotExist") for x in names])
+        return self.getMethodHelper(names, self.inputlist)
 
     def getOutputs(self, names=None):  # 7
         """
@@ -1229,17 +1774,11 @@ class ModelicaSystem(object):
         >>> getOutputs(["Name1","Name2"])
         """
         if not self.simulationFlag:
-            if (names == None):
-                return self.outputlist
-            elif (isinstance(names, str)):
-                return [self.outputlist.get(names, "NotExist")]
-            else:
-                return ([self.outputlist.get(x, "NotExist") for x in names])
+            return self.getMethodHelper(names, self.outputlist)
         else:
-            if (names == None):
-                for i in self.outputlist:
-                    value = self.getSolutions(i)
-                    self.outputlist[i] = value[0][-1]
+            if (names is None):
+                varList = list(self.outputlist)
+                self.outputlist.update(zip(varList, self._getFinalValues(varList)))
                 return self.outputlist
             elif (isinstance(names, str)):
                 if names in self.outputlist:
@@ -1248,15 +1787,13 @@ class ModelicaSystem(object):
                     return [self.outputlist.get(names)]
                 else:
                     return (names, " is not Output")
-            elif (isinstance(names, list)):
-                valuelist = []
+            else:
+                names = list(names)
                 for i in names:
-                    if i in self.outputlist:
-                        value = self.getSolutions(i)
-                        self.outputlist[i] = value[0][-1]
-                        valuelist.append(value[0][-1])
-                    else:
+                    if i not in self.outputlist:
                         return (i, "is not Output")
+                valuelist = self._getFinalValues(names)
+                self.outputlist.update(zip(names, valuelist))
                 return valuelist
 
     def getSimulationOptions(self, names=None):  # 8
@@ -1268,12 +1805,7 @@ class ModelicaSystem(object):
         >>> getSimulationOptions("Name1")
         >>> getSimulationOptions(["Name1","Name2"])
         """
-        if (names == None):
-            return self.simulateOptions
-        elif (isinstance(names, str)):
-            return [self.simulateOptions.get(names, "NotExist")]
-        elif (isinstance(names, list)):
-            return ([self.simulateOptions.get(x, "NotExist") for x in names])
+        return self.getMethodHelper(names, self.simulateOptions)
 
     def getLinearizationOptions(self, names=None):  # 9
         """
@@ -1284,12 +1816,7 @@ class ModelicaSystem(object):
         >>> getLinearizationOptions("Name1")
         >>> getLinearizationOptions(["Name1","Name2"])
         """
-        if (names == None):
-            return self.linearOptions
-        elif (isinstance(names, str)):
-            return [self.linearOptions.get(names, "NotExist")]
-        elif (isinstance(names, list)):
-            return ([self.linearOptions.get(x, "NotExist") for x in names])
+        return self.getMethodHelper(names, self.linearOptions)
 
     def getOptimizationOptions(self, names=None):  # 10
         """
@@ -1298,12 +1825,7 @@ class ModelicaSystem(object):
         >>> getOptimizationOptions("Name1")
         >>> getOptimizationOptions(["Name1","Name2"])
         """
-        if (names == None):
-            return self.optimizeOptions
-        elif (isinstance(names, str)):
-            return [self.optimizeOptions.get(names, "NotExist")]
-        elif (isinstance(names, list)):
-            return ([self.optimizeOptions.get(x, "NotExist") for x in names])
+        return self.getMethodHelper(names, self.optimizeOptions)
 
     # to simulate or re-simulate model
     def simulate(self, resultfile=None, simflags=None):  # 11
@@ -1318,12 +1840,10 @@ class ModelicaSystem(object):
             r = ""
             self.resultfile = os.path.join(self.tempdir, self.modelName + "_res.mat").replace("\\", "/")
         else:
-            if os.path.exists(resultfile):
-                r = " -r=" + resultfile
-                self.resultfile = resultfile
-            else:
-                r = " -r=" + os.path.join(self.tempdir, resultfile).replace("\\", "/")
-                self.resultfile = os.path.join(self.tempdir, resultfile).replace("\\", "/")
+            if not os.path.exists(resultfile):
+                resultfile = os.path.join(self.tempdir, resultfile).replace("\\", "/")
+            r = " -r=" + resultfile
+            self.resultfile = resultfile
 
         # allow runtime simulation flags from user input
         if (simflags is None):
@@ -1347,22 +1867,21 @@ class ModelicaSystem(object):
             override = ""
 
         if (self.inputFlag):  # if model has input quantities
-            for i in self.inputlist:
-                val = self.inputlist[i]
-                if (val == None):
-                    val = [(float(self.simulateOptions["startTime"]), 0.0),
-                           (float(self.simulateOptions["stopTime"]), 0.0)]
-                    self.inputlist[i] = [(float(self.simulateOptions["startTime"]), 0.0),
-                                         (float(self.simulateOptions["stopTime"]), 0.0)]
-                if float(self.simulateOptions["startTime"]) != val[0][0]:
+            startTime = float(self.simulateOptions["startTime"])
+            stopTime = float(self.simulateOptions["stopTime"])
+            for i, val in self.inputlist.items():
+                if (val is None):
+                    val = [(startTime, 0.0), (stopTime, 0.0)]
+                    self.inputlist[i] = [(startTime, 0.0), (stopTime, 0.0)]
+                if startTime != val[0][0]:
                     errstr = "!!! startTime not matched for Input {}".format(i)
                     self._raise_error(errstr=errstr)
                     return
-                if float(self.simulateOptions["stopTime"]) != val[-1][0]:
+                if stopTime != val[-1][0]:
                     errstr = "!!! stopTime not matched for Input {}".format(i)
                     self._raise_error(errstr=errstr)
                     return
-                if val[0][0] < float(self.simulateOptions["startTime"]):
+                if val[0][0] < startTime:
                     errstr = "Input time value is less than simulation startTime for inputs {}".format(i)
                     self._raise_error(errstr=errstr)
                     return
@@ -1371,19 +1890,14 @@ class ModelicaSystem(object):
         else:
             csvinput = ""
 
-        if (platform.system() == "Windows"):
-            getExeFile = os.path.join(self.tempdir, '{}.{}'.format(self.modelName, "exe")).replace("\\", "/")
-        else:
-            getExeFile = os.path.join(self.tempdir, self.modelName).replace("\\", "/")
-
-        if os.path.exists(getExeFile):
-            cmd = getExeFile + override + csvinput + r + simflags
+        if self.exeFile is not None and os.path.exists(self.exeFile):
+            cmd = self.exeFile + override + csvinput + r + simflags
             cmd = cmd.split(" ")
             self._run_cmd(cmd=cmd)
 
             self.simulationFlag = True
         else:
-            raise Exception("Error: Application file path not found: " + getExeFile)
+            raise Exception("Error: Application file path not found: {}".format(self.exeFile))
 
     # to extract simulation results
     def getSolutions(self, varList=None, resultfile=None):  # 12
@@ -1398,7 +1912,7 @@ class ModelicaSystem(object):
         >>> getSolutions("Name1",resultfile=""c:/a.mat"")
         >>> getSolutions(["Name1","Name2"],resultfile=""c:/a.mat"")
         """
-        if (resultfile == None):
+        if (resultfile is None):
             resFile = self.resultfile
         else:
             resFile = resultfile
@@ -1412,7 +1926,7 @@ class ModelicaSystem(object):
         else:
             resultVars = self.getconn.sendExpression("readSimulationResultVars(\"" + resFile + "\")")
             self.getconn.sendExpression("closeSimulationResultFile()")
-            if (varList == None):
+            if (varList is None):
                 return resultVars
             elif (isinstance(varList, str)):
                 if (varList not in resultVars and varList != "time"):
@@ -1425,8 +1939,8 @@ class ModelicaSystem(object):
                 exp2 = "closeSimulationResultFile()"
                 self.getconn.sendExpression(exp2)
                 return npRes
-            elif (isinstance(varList, list)):
-                # varList, = varList
+            else:
+                varList = list(varList)
                 for v in varList:
                     if v == "time":
                         continue
@@ -1444,9 +1958,18 @@ class ModelicaSystem(object):
 
     def strip_space(self, name):
         if (isinstance(name, str)):
-            return name.replace(" ", "")
+            return name.replace(" ", "") if " " in name else name
         elif (isinstance(name, list)):
-            return [x.replace(" ", "") for x in name]
+            return [self.strip_space(x) for x in name]
+
+    def _splitAssignment(self, assignment):
+        """
+        Split a "name=value" string given by the user into (name, value), ignoring spaces.
+        """
+        name, sep, value = self.strip_space(assignment).partition("=")
+        if not sep:
+            raise ModelicaSystemError("Expected \"name=value\", got \"{}\"".format(assignment))
+        return name, value
 
     def setMethodHelper(self, args1, args2, args3, args4=None):
         """
@@ -1456,36 +1979,27 @@ class ModelicaSystem(object):
         args3 - function name (eg; continuous, parameter, simulation, linearization,optimization)
         args4 - dict() which stores the new override variables list,
         """
-        def apply_single(args1):
-            args1 = self.strip_space(args1)
-            value = args1.split("=")
-            if value[0] in args2:
-                if (args3 == "parameter" and self.isParameterChangeable(value[0], value[1])):
-                    args2[value[0]] = value[1]
-                    if (args4 != None):
-                        args4[value[0]] = value[1]
-                elif (args3 != "parameter"):
-                    args2[value[0]] = value[1]
-                    if (args4 != None):
-                        args4[value[0]] = value[1]
-
-                return True
-
-            else:
-                errstr = "\"" + value[0] + "\"" + " is not a" + args3 + " variable"
-                self._raise_error(errstr=errstr)
-
-        result = []
         if (isinstance(args1, str)):
-            result = [apply_single(args1)]
+            args1 = [args1]
+        elif not isinstance(args1, list):
+            return True
+
+        assignments = OrderedDict(self._splitAssignment(var) for var in args1)
+        missing = assignments.keys() - args2.keys()
+        for name in [x for x in assignments if x in missing]:
+            errstr = "\"" + name + "\"" + " is not a" + args3 + " variable"
+            self._raise_error(errstr=errstr)
+            del assignments[name]
+
+        if args3 == "parameter":
+            for name in assignments.keys() & self._nonChangeable:
+                self.isParameterChangeable(name, assignments.pop(name))
 
-        elif (isinstance(args1, list)):
-            result = []
-            args1 = self.strip_space(args1)
-            for var in args1:
-                result.append(apply_single(var))
+        args2.update(assignments)
+        if (args4 is not None):
+            args4.update(assignments)
 
-        return all(result)
+        return not missing
 
     def setContinuous(self, cvals):  # 13
         """
@@ -1508,14 +2022,14 @@ class ModelicaSystem(object):
         return self.setMethodHelper(pvals, self.paramlist, "parameter", self.overridevariables)
 
     def isParameterChangeable(self, name, value):
-        q = self.getQuantities(name)
-        if (q[0]["changeable"] == "false"):
+        if name in self._nonChangeable:
             if self._verbose:
-                logger.info("setParameters() failed : It is not possible to set " +
-                            "the following signal \"{}\", ".format(name) + "It seems to be structural, final, " +
-                            "protected or evaluated or has a non-constant binding, use sendExpression(" +
-                            "setParameterValue({}, {}, {}), ".format(self.modelName, name, value) +
-                            "parsed=false) and rebuild the model using buildModel() API")
+                logger.info("setParameters() failed : It is not possible to set "
+                            "the following signal \"%s\", It seems to be structural, final, "
+                            "protected or evaluated or has a non-constant binding, use sendExpression("
+                            "setParameterValue(%s, %s, %s), "
+                            "parsed=false) and rebuild the model using buildModel() API",
+                            name, self.modelName, name, value)
             return False
         return True
 
@@ -1558,8 +2072,7 @@ class ModelicaSystem(object):
         >>> setInputs(["Name1=value1","Name2=value2"])
         """
         if (isinstance(name, str)):
-            name = self.strip_space(name)
-            value = name.split("=")
+            value = self._splitAssignment(name)
             if value[0] in self.inputlist:
                 tmpvalue = eval(value[1])
                 if (isinstance(tmpvalue, int) or isinstance(tmpvalue, float)):
@@ -1573,9 +2086,8 @@ class ModelicaSystem(object):
                 errstr = value[0] + " is not an input"
                 self._raise_error(errstr=errstr)
         elif (isinstance(name, list)):
-            name = self.strip_space(name)
             for var in name:
-                value = var.split("=")
+                value = self._splitAssignment(var)
                 if value[0] in self.inputlist:
                     tmpvalue = eval(value[1])
                     if (isinstance(tmpvalue, int) or isinstance(tmpvalue, float)):
@@ -1638,11 +2150,15 @@ class ModelicaSystem(object):
             sl = sl + el
 
         sl.sort()
-        for t in sl:
-            for i in inp:
-                for ttt in [tt[0] for tt in i]:
-                    if t not in [tt[0] for tt in i]:
-                        i.append((t, '?'))
+        # add a placeholder for every timestamp an input does not define yet
+        for i in inp:
+            if not i:
+                continue
+            times = set(tt[0] for tt in i)
+            for t in sl:
+                if t not in times:
+                    i.append((t, '?'))
+                    times.add(t)
         inpSortedList = list()
         sortedList = list()
         for i in inp:
@@ -1800,15 +2316,14 @@ class ModelicaSystem(object):
         file.close()
 
         override = " -overrideFile=" + overrideLinearFile
-        logger.debug(f"overwrite = {override}")
+        logger.debug("overwrite = %s", override)
 
         if self.inputFlag:
-            nameVal = self.getInputs()
-            for n in nameVal:
-                tupleList = nameVal.get(n)
+            startTime = float(self.simulateOptions["startTime"])
+            for tupleList in self.getInputs().values():
                 if tupleList is not None:
                     for l in tupleList:
-                        if l[0] < float(self.simulateOptions["startTime"]):
+                        if l[0] < startTime:
                             raise ModelicaSystemError('Input time value is less than simulation startTime')
             self.createCSVData()
             csvinput = " -csvInput=" + self.csvFile
@@ -1816,11 +2331,6 @@ class ModelicaSystem(object):
             csvinput = ""
 
         ## prepare the linearization runtime command
-        if (platform.system() == "Windows"):
-            getExeFile = os.path.join(self.tempdir, '{}.{}'.format(self.modelName, "exe")).replace("\\", "/")
-        else:
-            getExeFile = os.path.join(self.tempdir, self.modelName).replace("\\", "/")
-
         if lintime is None:
             linruntime = " -l=" + str(self.linearOptions["stopTime"])
         else:
@@ -1829,12 +2339,12 @@ class ModelicaSystem(object):
         if simflags is None:
             simflags = ""
 
-        if (os.path.exists(getExeFile)):
-            cmd = getExeFile + linruntime + override + csvinput + simflags
+        if self.exeFile is not None and os.path.exists(self.exeFile):
+            cmd = self.exeFile + linruntime + override + csvinput + simflags
             cmd = cmd.split(' ')
             self._run_cmd(cmd=cmd)
         else:
-            raise Exception("Error: Application file path not found: " + getExeFile)
+            raise Exception("Error: Application file path not found: {}".format(self.exeFile))
 
         # code to get the matrix and linear inputs, outputs and states
         linearFile = os.path.join(self.tempdir, "linearized_model.py").replace("\\", "/")
@@ -1910,7 +2420,7 @@ def FindBestOMCSession(*args, **kwargs):
     raise Exception("Failed to use omc --version or omc +version. Is omc on the PATH?")
   zmq = False
   v = v.strip().split("-")[0].split("~")[0].strip()
-  a = re.search(r"v?([0-9]+)[.]([0-9]+)[.][0-9]+", v)
+  a = _RE_OMC_VERSION.search(v)
   try:
     major = int(a.group(1))
     minor = int(a.group(2))
@@ -62,7 +62,6 @@ setup(name='OMPython',
       install_requires=[
           'future',
           'numpy',
-          'psutil',
           'pyparsing',
           'pyzmq'
       ],
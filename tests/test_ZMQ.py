@@ -32,6 +32,26 @@ end M;"""
     self.om.sendExpression('res:=simulate(M, stopTime=2.0)')
     self.assertNotEqual("", self.om.sendExpression('res.resultFile'))
     self.clean()
+  def testSendExpressions(self):
+    self.assertEqual(["a", 2, True], self.om.sendExpressions(['"a"', '1+1', 'true']))
+    self.assertEqual("HelloWorld!", self.om.sendExpression('"HelloWorld!"'))
+    self.clean()
+  def testAskMany(self):
+    self.assertEqual(True, self.om.sendExpression('loadString("%s")' % self.simpleModel))
+    self.assertEqual([True, False], self.om.ask_many('isModel', ['M', 'Real']))
+    self.clean()
+  def testGetAllInheritedClasses(self):
+    self.assertEqual(True, self.om.sendExpression('loadString("model B end B; model D extends B; end D;")'))
+    # every answer must come from the single combined expression, not from the per-item fallback
+    sent = []
+    sendExpression = self.om.sendExpression
+    self.om.sendExpression = lambda command, parsed=True: sent.append(command) or sendExpression(command, parsed)
+    self.assertEqual(['B'], self.om.getAllInheritedClasses('D'))
+    self.assertEqual([], self.om.getAllInheritedClasses('B'))
+    self.assertEqual(2, len(sent))
+    self.om.sendExpression = sendExpression
+    self.assertEqual("", self.om.sendExpression('getErrorString()'))
+    self.clean()
 
 class FindBestOMCSession(unittest.TestCase):
   def __init__(self, *args, **kwargs):
@@ -55,5 +75,12 @@ end M;"""
     self.assertEqual("HelloWorld!", self.om.sendExpression('"HelloWorld!"'))
     self.clean()
 
+class OMCSessionPoolTester(unittest.TestCase):
+  def testSendExpressions(self):
+    pool = OMPython.OMCSessionPool(n=2)
+    self.assertEqual([2, 3, 4], pool.sendExpressions(['1+1', '1+2', '2+2']))
+    self.assertEqual([True, True], pool.sendExpressionAll('loadString("model M end M;")'))
+    pool.close()
+
 if __name__ == '__main__':
     unittest.main()
@@ -17,6 +17,8 @@ class TypeCheckTester(unittest.TestCase):
     def testBoolean(self):
         self.assertEqual(typeCheck('true'), True)
         self.assertEqual(typeCheck('false'), False)
+        self.assertEqual(typeCheck('true\n'), True)
+        self.assertEqual(typeCheck('false\n'), False)
 
     def testInt(self):
         self.assertEqual(typeCheck('2'), 2)
@@ -33,10 +35,29 @@ class TypeCheckTester(unittest.TestCase):
 
     def testEmpty(self):
         self.assertEqual(typeCheck(''), None)
+        self.assertEqual(typeCheck('\n'), None)
         pass
 
     def testStr(self):
-        pass
+        self.assertEqual(typeCheck('"abc"'), "abc")
+        self.assertEqual(typeCheck('"a\\"b"'), 'a"b')
+
+    def testArray(self):
+        self.assertEqual(typeCheck('{1, 2.5, "x", A.b}\n'), (1, 2.5, "x", "A.b"))
+        self.assertEqual(typeCheck('{}'), ())
+        self.assertEqual(typeCheck('{1 + 1, 1}'), (2, 1))
+
+    def testOption(self):
+        self.assertEqual(typeCheck('NONE()'), None)
+        self.assertEqual(typeCheck('SOME(1)'), 1)
+
+    def testRecord(self):
+        self.assertEqual(typeCheck('record A.B\n  x = 1,\n  y = (true, NONE())\nend A.B;'), {"x": 1, "y": (True, None)})
+
+    def testFastParserMatchesGrammar(self):
+        for s in ['{{1,true,3},{"4",5.9,6,NONE()}}', 'record R a = SOME({}), b = "", a = 2 end R;', ' -0.0 ', '1e5',
+                  'NONE', 'trueX', '(x, (), {A.b})']:
+            self.assertEqual(typeCheck(s), OMTypedParser.omcGrammar.parseString(s)[0])
 
     def testUnStringable(self):
         pass